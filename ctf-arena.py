@@ -4,10 +4,15 @@ CTF Arena - Last Container Standing
 Each agent gets a vulnerable container. AI tools run on host, SSH into containers.
 """
 
+import hashlib
+import json
+import shlex
 import subprocess
 import sys
 import os
 import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Configuration
@@ -15,6 +20,7 @@ NETWORK_NAME = "ctf-arena"
 SESSION_NAME = "ctf-battle"
 BASE_IMAGE = "ctf-vulnerable"
 DOCKERFILE_DIR = Path(__file__).parent / "ctf"
+WORKSPACES_DIR = Path(__file__).parent / "ctf-workspaces"
 
 # AI tools - run on host, interact with assigned container
 # Colors: tmux 256-color codes matching each tool's brand
@@ -80,6 +86,9 @@ ALL_AGENTS = [
 # Active agents (filtered from ALL_AGENTS based on command line)
 AGENTS = ALL_AGENTS
 
+# Name lookup, computed once at import
+_AGENTS_BY_NAME = {a['name']: a for a in ALL_AGENTS}
+
 
 def get_agent_names():
     """Get list of all available agent names"""
@@ -90,12 +99,12 @@ def filter_agents(names):
     """Filter agents by name, return filtered list. Supports duplicates."""
     if not names:
         return ALL_AGENTS
-    available = {a['name']: a for a in ALL_AGENTS}
+    totals = Counter(names)  # How many of each agent type were requested
     filtered = []
-    counts = {}  # Track how many of each agent type
+    counts = {}  # Instances handed out so far per type
 
     for name in names:
-        if name not in available:
+        if name not in _AGENTS_BY_NAME:
             print(f"⚠️  Unknown agent: {name}")
             print(f"   Available: {', '.join(get_agent_names())}")
             sys.exit(1)
@@ -105,8 +114,8 @@ def filter_agents(names):
         instance_num = counts[name]
 
         # Create a copy with unique instance identifier
-        agent = available[name].copy()
-        if instance_num > 1 or names.count(name) > 1:
+        agent = _AGENTS_BY_NAME[name].copy()
+        if totals[name] > 1:
             # Add number suffix for duplicates
             agent['instance'] = f"{name}-{instance_num}"
             agent['container'] = f"ctf-{name}-{instance_num}"
@@ -119,137 +128,342 @@ def filter_agents(names):
     return filtered
 
 
+def prepare_specs(env):
+    """Materialize per-agent constants (instance, ip, env args, volume) once.
+
+    Downstream functions read these off the agent dict instead of
+    recomputing ip strings and docker args at every call site.
+    """
+    specs = []
+    for i, agent in enumerate(AGENTS):
+        env_args = []
+        for key in agent.get('env', []):
+            if key in env:
+                env_args += ["-e", f"{key}={env[key]}"]
+        specs.append({
+            **agent,
+            "instance": agent.get('instance', agent['name']),
+            "ip": f"172.20.0.{10 + i}",
+            "env_args": env_args,
+            "volume": f"ctf-{agent['name']}-root",
+        })
+    return specs
+
+
 def run(cmd, check=True, capture=False, show=True):
-    """Run shell command"""
+    """Run a command - argv list (no shell fork) or string (through /bin/sh)"""
     if show:
-        print(f"  $ {cmd}")
+        print(f"  $ {cmd if isinstance(cmd, str) else ' '.join(cmd)}")
+    shell = isinstance(cmd, str)
+    # /bin/sh directly for the few commands that need shell features
+    kwargs = {"executable": "/bin/sh"} if shell else {}
     if capture:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        result = subprocess.run(cmd, shell=shell, capture_output=True, text=True, **kwargs)
         return result.stdout.strip(), result.returncode
     else:
-        result = subprocess.run(cmd, shell=True)
+        result = subprocess.run(cmd, shell=shell, **kwargs)
         return None, result.returncode
 
 
+class TmuxControl:
+    """One long-lived tmux control-mode client (tmux -C) for issuing many
+    commands over a single connection instead of a fork per command.
+
+    Replies are framed as %begin ... %end (or %error); other %-prefixed
+    lines are async notifications and get skipped.
+    """
+
+    def __init__(self, session=SESSION_NAME):
+        self.proc = subprocess.Popen(
+            ["tmux", "-C", "attach", "-t", session],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True)
+        # tmux sends an empty %begin/%end block on attach - drain it so
+        # replies line up with commands
+        self._read_reply()
+
+    def _read_reply(self):
+        out = []
+        while True:
+            reply = self.proc.stdout.readline()
+            if not reply or reply.startswith(("%end", "%error")):
+                break
+            if reply.startswith("%"):
+                continue  # %begin / async notification
+            out.append(reply.rstrip("\n"))
+        return "\n".join(out)
+
+    def send(self, *args):
+        """Issue one tmux command, return its output (errors are ignored)"""
+        line = " ".join(shlex.quote(a) for a in args)
+        try:
+            self.proc.stdin.write(line + "\n")
+            self.proc.stdin.flush()
+        except BrokenPipeError:
+            return ""
+        return self._read_reply()
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
 def load_env():
-    """Load environment from .env file"""
+    """Load environment from .env file (parse cached by mtime in .env.cache)"""
     env_file = Path(__file__).parent / ".env"
+    cache_file = Path(__file__).parent / ".env.cache"
     env = dict(os.environ)
-    if env_file.exists():
-        with open(env_file) as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#') and '=' in line:
-                    key, value = line.split('=', 1)
-                    env[key.strip()] = value.strip().strip('"\'')
+    if not env_file.exists():
+        return env
+
+    mtime = env_file.stat().st_mtime
+    if cache_file.exists():
+        try:
+            cached = json.loads(cache_file.read_text())
+            if cached.get("mtime") == mtime:
+                env.update(cached["vars"])
+                return env
+        except (ValueError, KeyError, AttributeError, TypeError):
+            pass  # stale/corrupt cache (wrong shape included) - reparse below
+
+    parsed = {}
+    with open(env_file) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                parsed[key.strip()] = value.strip().strip('"\'')
+    env.update(parsed)
+
+    # Write atomically so a concurrent invocation never reads a partial cache,
+    # and 0600 - the cache holds the same API keys as .env
+    tmp = cache_file.with_name(cache_file.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(json.dumps({"mtime": mtime, "vars": parsed}))
+    tmp.replace(cache_file)
     return env
 
 
+def _image_hash():
+    """Hash the Dockerfile dir contents - cheap change detection for the image"""
+    h = hashlib.blake2b()
+    for path in sorted(DOCKERFILE_DIR.rglob('*')):
+        if path.is_file():
+            h.update(str(path.relative_to(DOCKERFILE_DIR)).encode())
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+
 def build_image():
-    """Build the vulnerable container image"""
+    """Build the vulnerable container image (skipped when nothing changed)"""
     print("\n🔨 Building vulnerable container image...")
     if not DOCKERFILE_DIR.exists():
         print(f"❌ Dockerfile directory not found: {DOCKERFILE_DIR}")
         sys.exit(1)
-    run(f"docker build -t {BASE_IMAGE} {DOCKERFILE_DIR}")
+
+    # Even a fully-cached docker build pays daemon + context-send overhead;
+    # skip it entirely when the build context hash matches the last build
+    marker = Path(__file__).parent / ".ctf-image.hash"
+    digest = _image_hash()
+    if marker.exists() and marker.read_text() == digest:
+        _, rc = run(["docker", "image", "inspect", BASE_IMAGE], capture=True, show=False)
+        if rc == 0:
+            print("✅ Image unchanged (build skipped)")
+            return
+
+    _, rc = run(["docker", "build", "-t", BASE_IMAGE, str(DOCKERFILE_DIR)])
+    if rc != 0:
+        # Don't record the digest - a failed build must not get skipped next run
+        print("❌ Image build failed")
+        sys.exit(1)
+    marker.write_text(digest)
     print("✅ Image built successfully")
 
 
 def setup_network():
-    """Create Docker network for CTF"""
+    """Create Docker network for CTF (kept as-is when it already matches)"""
     print("\n🌐 Setting up CTF network...")
-    run(f"docker network rm {NETWORK_NAME} 2>/dev/null || true", check=False)
-    run(f"docker network create {NETWORK_NAME} --subnet=172.20.0.0/24")
-
-
-def cleanup(remove_volumes=False):
-    """Stop and remove all CTF containers"""
+    # Recreating an existing network would detach running containers (and
+    # churn netns for nothing), so only rebuild when the subnet is wrong
+    out, rc = run(["docker", "network", "inspect", "-f", "{{.IPAM.Config}}", NETWORK_NAME],
+                  capture=True, check=False, show=False)
+    if rc == 0:
+        if "172.20.0.0/24" in out:
+            print("  ✅ Network already up")
+            return
+        run(["docker", "network", "rm", NETWORK_NAME], check=False, capture=True, show=False)
+    run(["docker", "network", "create", NETWORK_NAME, "--subnet=172.20.0.0/24", "--attachable"])
+
+
+def cleanup(remove_volumes=False, stop_only=False):
+    """Stop (and optionally remove) all CTF containers"""
     print("\n🧹 Cleaning up existing containers...")
-    # Remove ALL ctf-* containers (not just current agents)
-    run("docker rm -f $(docker ps -aq --filter name=ctf-) 2>/dev/null || true", check=False)
+    # Target ALL ctf-* containers (not just current agents); list in Python
+    # instead of shelling out for a $(docker ps ...) substitution
+    ids, _ = run(["docker", "ps", "-q" if stop_only else "-aq", "--filter", "name=ctf-"],
+                 capture=True, show=False)
+    if ids:
+        if stop_only:
+            run(["docker", "stop", *ids.split()])
+        else:
+            run(["docker", "rm", "-f", *ids.split()])
     if remove_volumes:
-        run("docker volume rm $(docker volume ls -q --filter name=ctf-) 2>/dev/null || true", check=False)
-    run(f"tmux kill-session -t {SESSION_NAME} 2>/dev/null || true", check=False)
+        vols, _ = run(["docker", "volume", "ls", "-q", "--filter", "name=ctf-"],
+                      capture=True, show=False)
+        if vols:
+            run(["docker", "volume", "rm", *vols.split()])
+    run(["tmux", "kill-session", "-t", SESSION_NAME], check=False, capture=True, show=False)
     if remove_volumes:
         print("🗑️  Volumes removed (login credentials wiped)")
 
 
-def start_containers(env):
+def inspect_running(containers):
+    """Check running state and arena IP of many containers with one docker inspect call"""
+    # 'with' guards the network lookup so containers off the arena network
+    # just report an empty ip instead of a template error
+    fmt = ("{{.Name}} {{.State.Running}} "
+           '{{with index .NetworkSettings.Networks "' + NETWORK_NAME + '"}}{{.IPAddress}}{{end}}')
+    out, _ = run(["docker", "inspect", "-f", fmt, *containers], capture=True, show=False)
+    states = {}
+    for line in out.splitlines():
+        parts = line.split()
+        if len(parts) >= 2:
+            states[parts[0].lstrip('/')] = {
+                "running": parts[1] == "true",
+                "ip": parts[2] if len(parts) > 2 else "",
+            }
+    # Containers docker doesn't know about just don't appear in the output
+    return states
+
+
+def _start_one(agent):
+    """Start the vulnerable container for a single agent"""
+    print(f"  Starting {agent['container']}...")
+
+    # Start vulnerable container with AI tools (entrypoint starts services)
+    # --init adds tini as PID 1 so kill 1 works (halt/shutdown)
+    # Persistent /root volume so login credentials persist
+    # Instructions are a read-only bind mount; /start.sh symlinks them in place
+    cmd = ["docker", "run", "-d",
+           "--init",
+           "--name", agent['container'],
+           "--network", NETWORK_NAME,
+           "--ip", agent['ip'],
+           "--hostname", agent['name'],
+           *agent['env_args'],
+           "-v", f"{agent['volume']}:/root",
+           "-v", f"{WORKSPACES_DIR / agent['instance']}:/root/instructions:ro",
+           BASE_IMAGE,
+           "bash", "-c", "/start.sh && sleep infinity"]
+    run(cmd)
+
+    print(f"  ✅ {agent['container']} starting at {agent['ip']}")
+
+
+def wait_ready(agent, timeout=15):
+    """Poll until /start.sh has finished inside the container.
+
+    The instruction symlinks are the last thing /start.sh creates, so their
+    presence means all services are up too - sshd alone would pass while
+    mysql/apache are still starting and before the agent CLI's AGENTS.md exists.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        rc = subprocess.call(
+            ["docker", "exec", agent['container'], "test", "-L", "/root/AGENTS.md"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if rc == 0:
+            return True
+        time.sleep(0.25)
+    return False
+
+
+def start_containers():
     """Start vulnerable containers for each agent"""
     print("\n🐳 Starting vulnerable containers...")
 
-    for i, agent in enumerate(AGENTS):
-        print(f"\n  Starting {agent['container']}...")
-
-        ip = f"172.20.0.{10 + i}"
+    # docker run is I/O-bound on the daemon socket, so spawn them all at once
+    with ThreadPoolExecutor(max_workers=len(AGENTS)) as ex:
+        list(ex.map(_start_one, AGENTS))
 
-        # Build env args for API keys
-        env_args = []
-        for key in agent.get('env', []):
-            if key in env:
-                env_args.append(f"-e {key}={env[key]}")
-        env_str = ' '.join(env_args)
-
-        # Persistent volume for /root (login credentials persist)
-        volume_name = f"ctf-{agent['name']}-root"
-        volumes_str = f"-v {volume_name}:/root"
-
-        # Start vulnerable container with AI tools (entrypoint starts services)
-        # --init adds tini as PID 1 so kill 1 works (halt/shutdown)
-        cmd = f"""docker run -d \
-            --init \
-            --name {agent['container']} \
-            --network {NETWORK_NAME} \
-            --ip {ip} \
-            --hostname {agent['name']} \
-            {env_str} \
-            {volumes_str} \
-            {BASE_IMAGE} \
-            bash -c "/start.sh && sleep infinity"
-        """
-        run(cmd)
-
-        print(f"  ✅ {agent['container']} starting at {ip}")
-
-    # Wait for services to come up
+    # Wait for services to come up - poll instead of a flat sleep
     print("\n  ⏳ Waiting for services to initialize...")
-    time.sleep(10)
+    with ThreadPoolExecutor(max_workers=len(AGENTS)) as ex:
+        for agent, ready in zip(AGENTS, ex.map(wait_ready, AGENTS)):
+            if not ready:
+                print(f"  ⚠️  {agent['container']}: services still not up after 15s")
 
-    # Verify containers are running
+    # Verify containers are running - one docker inspect for all of them
     print("\n  🔍 Verifying containers...")
+    states = inspect_running([a['container'] for a in AGENTS])
     for agent in AGENTS:
-        output, _ = run(f"docker inspect -f '{{{{.State.Running}}}}' {agent['container']}", capture=True, show=False)
-        status = "✅ running" if output == "true" else "❌ not running"
+        running = states.get(agent['container'], {}).get("running")
+        status = "✅ running" if running else "❌ not running"
         print(f"    {agent['container']}: {status}")
 
 
-def create_agent_workdirs():
-    """Create working directories for each agent with combined instructions"""
-    print("\n📁 Creating agent workspaces...")
+def _reset_one(agent):
+    """Reset a running container for a fresh battle (kill AI tools, restart services)"""
+    print(f"  ♻️  Reusing {agent['container']}...")
+    tools = '|'.join(get_agent_names())
+    run(["docker", "exec", agent['container'], "pkill", "-f", tools], check=False, capture=True, show=False)
+    run(["docker", "exec", agent['container'], "/start.sh"], check=False, capture=True, show=False)
 
-    base_dir = Path(__file__).parent / "ctf-workspaces"
-    base_dir.mkdir(exist_ok=True)
 
+def ensure_containers():
+    """Start containers only for agents that aren't already running, reset the rest.
+
+    Skips the full container-creation cost (cgroups, netns, image untar) on
+    repeat runs — existing containers just get their AI tool state reset via
+    docker exec. The ctf-<name>-root volumes already persist logins.
+    """
+    print("\n🐳 Ensuring vulnerable containers...")
+    states = inspect_running([a['container'] for a in AGENTS])
+
+    def ensure_one(agent):
+        state = states.get(agent['container'], {})
+        if state.get("running") and state.get("ip") == agent['ip']:
+            _reset_one(agent)
+        else:
+            if state.get("running"):
+                # IPs are positional, so a different agent lineup leaves the old
+                # container at the wrong address - its instructions would lie
+                print(f"  ⚠️  {agent['container']} at {state.get('ip') or '?'}, "
+                      f"expected {agent['ip']} - recreating")
+            # Clear any leftover so docker run doesn't hit a name clash
+            run(["docker", "rm", "-f", agent['container']], check=False, capture=True, show=False)
+            _start_one(agent)
+            wait_ready(agent)
+
+    with ThreadPoolExecutor(max_workers=len(AGENTS)) as ex:
+        list(ex.map(ensure_one, AGENTS))
+
+
+def build_instructions(agent):
+    """Build the combined instructions for one agent, return (filename, content)"""
     # Read the base CTF rules
     rules_src = Path(__file__).parent / 'CTF_RULES.md'
     base_rules = rules_src.read_text() if rules_src.exists() else ""
 
-    for i, agent in enumerate(AGENTS):
-        instance = agent.get('instance', agent['name'])
-        agent_dir = base_dir / instance
-        agent_dir.mkdir(exist_ok=True)
-
-        ip = f"172.20.0.{10 + i}"
-        other_ips = [f"172.20.0.{10 + j}" for j in range(len(AGENTS)) if j != i]
+    instance = agent['instance']
+    ip = agent['ip']
+    other_ips = [a['ip'] for a in AGENTS if a['ip'] != ip]
 
-        # Prepend agent-specific info to rules
-        gemini_note = """
+    # Prepend agent-specific info to rules
+    gemini_note = """
 ## Important
 
 NEVER use interactive shells or commands that require user input. Always use non-interactive alternatives (e.g., `ssh -o BatchMode=yes`, `echo password | command`, heredocs, etc.).
 
 """ if agent['name'] == "gemini" else ""
-        agent_info = f"""## Your Identity
+    agent_info = f"""## Your Identity
 
 You are **{instance}**. Your container IP is **{ip}**.
 
@@ -260,181 +474,141 @@ You are **{instance}**. Your container IP is **{ip}**.
 ---
 
 """
-        combined = agent_info + base_rules
+    # Always AGENTS.md - containers symlink CLAUDE.md/GEMINI.md to it
+    return "AGENTS.md", agent_info + base_rules
 
-        # Save as CLAUDE.md or AGENTS.md (based on base agent name)
-        filename = "CLAUDE.md" if agent['name'] == "claude" else "GEMINI.md" if agent['name'] == "gemini" else "AGENTS.md"
+
+def create_agent_workdirs():
+    """Create working directories for each agent with combined instructions"""
+    print("\n📁 Creating agent workspaces...")
+
+    base_dir = WORKSPACES_DIR
+    base_dir.mkdir(exist_ok=True)
+
+    for agent in AGENTS:
+        agent_dir = base_dir / agent['instance']
+        agent_dir.mkdir(exist_ok=True)
+
+        filename, combined = build_instructions(agent)
         (agent_dir / filename).write_text(combined)
-        print(f"  ✅ Created {filename} for {instance}")
+        print(f"  ✅ Created {filename} for {agent['instance']}")
 
     return base_dir
 
 
-def setup_tmux(workspaces_dir, env):
+def setup_tmux():
     """Create tmux session with panes for each agent"""
     print("\n🖥️ Setting up tmux arena...")
 
-    # Create session
-    run(f"tmux new-session -d -s {SESSION_NAME} -x 200 -y 50")
-
-    # Configure tmux
-    run(f"tmux set -t {SESSION_NAME} pane-border-status top")
-    run(f"tmux set -t {SESSION_NAME} pane-border-lines heavy")
-    run(f"tmux set -t {SESSION_NAME} pane-border-style 'fg=white'")
-    run(f"tmux set -t {SESSION_NAME} pane-active-border-style 'fg=white'")
-    # Build pane-border-format with per-agent colors based on pane index
-    # Uses nested conditionals: #{?#{==:#{pane_index},0},color0_name,...}
-    format_parts = []
-    for i, agent in enumerate(AGENTS):
-        color = agent.get('color', 'white')
-        instance = agent.get('instance', agent['name'])
-        format_parts.append(f"#{{?#{{==:#{{pane_index}},{i}}},#[fg={color}]#[bold] {instance} ,")
-    # Close all the conditionals and add fallback
-    border_format = ''.join(format_parts) + "#[fg=white] ? " + "}" * len(AGENTS)
-    run(f"tmux set -t {SESSION_NAME} pane-border-format '{border_format}'")
-    run(f"tmux set -t {SESSION_NAME} allow-rename off")
-    run(f"tmux set -t {SESSION_NAME} automatic-rename off")
-    run(f"tmux set -t {SESSION_NAME} set-titles off")
-    run(f"tmux set -t {SESSION_NAME} remain-on-exit on")
-    run(f"tmux set -t {SESSION_NAME} status off")
+    # Each pane runs docker exec as its own process (not typed into a host
+    # shell) so tmux itself observes the death when a container is killed.
+    # The agent CLI launches directly - no intermediate bash to fork or
+    # send-keys into later
+    def pane_cmd(agent):
+        return f"docker exec -it {agent['container']} sh -lc {shlex.quote(agent['run'])}"
+
+    # Create session - pane 0 belongs to the first agent
+    run(["tmux", "new-session", "-d", "-s", SESSION_NAME, "-x", "200", "-y", "50", pane_cmd(AGENTS[0])])
+
+    # Constant pane-border-format: the title and a per-pane @agent_color user
+    # option, so tmux doesn't re-evaluate an O(N)-deep conditional per redraw
+    border_format = "#[fg=#{?#{@agent_color},#{@agent_color},white},bold] #{pane_title} "
+
     # Ctrl+B q to kill session and cleanup containers
     cleanup_cmd = "docker rm -f $(docker ps -aq --filter name=ctf-) 2>/dev/null; docker network rm ctf-arena 2>/dev/null"
-    run(f"tmux bind-key q run-shell '{cleanup_cmd}; tmux kill-session -t {SESSION_NAME}'", check=False)
-    # Ctrl+B f to send "read <file>.md. Fight" to all panes
-    def fight_cmd(i, agent):
-        pane = f"{SESSION_NAME}:0.{i}"
-        if agent['name'] == "claude":
-            mdfile = "CLAUDE.md"
-        elif agent['name'] == "gemini":
-            mdfile = "GEMINI.md"
-        else:
-            mdfile = "AGENTS.md"
-        return f'sleep 0.1 && tmux send-keys -t {pane} "read {mdfile}. Fight" && sleep 0.1 && tmux send-keys -t {pane} Enter'
-    send_cmds = " && ".join([fight_cmd(i, AGENTS[i]) for i in range(len(AGENTS))])
-    run("tmux unbind-key -T prefix f", check=False)
-    run(f"tmux bind-key -T prefix f run-shell '{send_cmds}'", check=False)
-    # Layout depends on agent count
-    layout = "even-horizontal" if len(AGENTS) == 2 else "tiled"
 
-    # Keep panes equal size on resize
-    run(f"tmux set-hook -t {SESSION_NAME} client-resized 'select-layout {layout}'", check=False)
+    # Ctrl+B f to send "read AGENTS.md. Fight" to all panes at once via
+    # synchronize-panes (same trick as send_go) instead of per-pane send-keys
+    fight_cmds = (f"set -t {SESSION_NAME} synchronize-panes on ; "
+                  f'send-keys -t {SESSION_NAME}:0.0 "read AGENTS.md. Fight" Enter ; '
+                  f"set -t {SESSION_NAME} synchronize-panes off")
 
-    # Create panes
-    for i in range(1, len(AGENTS)):
-        run(f"tmux split-window -t {SESSION_NAME} -h")
-        run(f"tmux select-layout -t {SESSION_NAME} {layout}")
+    # Layout depends on agent count
+    layout = "even-horizontal" if len(AGENTS) == 2 else "tiled"
 
-    # Setup each pane - exec into container
+    # Configure tmux over a single control-mode client - one connection
+    # for the whole setup instead of a fork+connect per command
+    tmux_cmds = [
+        ["set", "-t", SESSION_NAME, "pane-border-status", "top"],
+        ["set", "-t", SESSION_NAME, "pane-border-lines", "heavy"],
+        ["set", "-t", SESSION_NAME, "pane-border-style", "fg=white"],
+        ["set", "-t", SESSION_NAME, "pane-active-border-style", "fg=white"],
+        ["set", "-t", SESSION_NAME, "pane-border-format", border_format],
+        ["set", "-t", SESSION_NAME, "allow-rename", "off"],
+        ["set", "-t", SESSION_NAME, "automatic-rename", "off"],
+        ["set", "-t", SESSION_NAME, "set-titles", "off"],
+        ["set", "-t", SESSION_NAME, "remain-on-exit", "on"],
+        ["set", "-t", SESSION_NAME, "status", "off"],
+        ["bind-key", "q", "run-shell", f"{cleanup_cmd}; tmux kill-session -t {SESSION_NAME}"],
+        ["bind-key", "-T", "prefix", "f", fight_cmds],
+        # Keep panes equal size on resize
+        ["set-hook", "-t", SESSION_NAME, "client-resized", f"select-layout {layout}"],
+        # Container killed -> docker exec exits -> tmux turns the pane red.
+        # remain-on-exit keeps the dead pane around, no monitor process needed
+        # (run-shell because hook args only expand #{hook_pane} via formats)
+        ["set-hook", "-t", SESSION_NAME, "pane-died",
+         'run-shell "tmux select-pane -t #{hook_pane} -P bg=red,fg=white"'],
+    ]
+    print("  $ tmux -C <batched commands>")
+    tmux = TmuxControl()
+    for tmux_cmd in tmux_cmds:
+        tmux.send(*tmux_cmd)
+
+    # Create panes, each already exec'd into its container
+    for agent in AGENTS[1:]:
+        tmux.send("split-window", "-t", SESSION_NAME, "-h", pane_cmd(agent))
+        tmux.send("select-layout", "-t", SESSION_NAME, layout)
+
+    # Set pane titles and border colors
     for i, agent in enumerate(AGENTS):
         pane = f"{SESSION_NAME}:0.{i}"
-        container = agent['container']
-        instance = agent.get('instance', agent['name'])
-
-        # Set pane title
-        run(f"tmux select-pane -t {pane} -T '{instance}'")
-
-        # Exec into the container
-        run(f"tmux send-keys -t {pane} 'docker exec -it {container} bash' C-m")
-        time.sleep(0.5)
+        tmux.send("select-pane", "-t", pane, "-T", agent['instance'])
+        tmux.send("set", "-p", "-t", pane, "@agent_color", agent.get('color', 'white'))
+    tmux.close()
 
-        # Clean up old files and copy combined instructions file
-        filename = "CLAUDE.md" if agent['name'] == "claude" else "GEMINI.md" if agent['name'] == "gemini" else "AGENTS.md"
-        src = workspaces_dir / instance / filename
-        run(f"docker exec {container} rm -f /root/AGENT.md /root/AGENTS.md /root/CLAUDE.md /root/GEMINI.md /root/INSTRUCTIONS.md /root/CTF_RULES.md", show=False)
-        run(f"docker cp {src} {container}:/root/{filename}", show=False)
+    # Give the in-container shells a moment to come up
+    time.sleep(0.5)
 
 
 def start_agents():
-    """Start the AI tools in each pane"""
-    print("\n🚀 Starting AI agents...")
-    for i, agent in enumerate(AGENTS):
-        pane = f"{SESSION_NAME}:0.{i}"
-        run(f"tmux send-keys -t {pane} 'clear' C-m", show=False)
-    time.sleep(0.5)
+    """Respawn stopped panes - agents launch with their panes automatically"""
+    print("\n🚀 Restarting any stopped agents...")
+    # The control-mode client swallows errors, so a dead attach would look
+    # like success - make sure the arena session actually exists first
+    _, rc = run(["tmux", "has-session", "-t", SESSION_NAME], check=False, capture=True, show=False)
+    if rc != 0:
+        print(f"❌ No arena session - run 'python ctf-arena.py run' or 'setup' first")
+        sys.exit(1)
+    tmux = TmuxControl()
     for i, agent in enumerate(AGENTS):
         pane = f"{SESSION_NAME}:0.{i}"
-        run(f"tmux send-keys -t {pane} '{agent['run']}' C-m")
-    print("🎮 All agents started!")
+        # respawn-pane without -k only touches dead panes; clear the red
+        # "eliminated" styling afterwards (the pane-died hook re-marks the
+        # pane if the exec dies again)
+        tmux.send("respawn-pane", "-t", pane)
+        tmux.send("select-pane", "-t", pane, "-P", "default")
+    tmux.close()
+    print("🎮 All agents running!")
 
 
 def send_go():
     """Send 'Fight' message to all running agents simultaneously"""
     print("\n⚡ Sending Fight to all agents...")
     # Use synchronize-panes to send to all at once
-    run(f"tmux set -t {SESSION_NAME} synchronize-panes on", show=False)
-    run(f"tmux send-keys -t {SESSION_NAME}:0.0 'Fight' Enter", show=False)
-    run(f"tmux set -t {SESSION_NAME} synchronize-panes off", show=False)
+    run(["tmux", "set", "-t", SESSION_NAME, "synchronize-panes", "on", ";",
+         "send-keys", "-t", f"{SESSION_NAME}:0.0", "Fight", "Enter", ";",
+         "set", "-t", SESSION_NAME, "synchronize-panes", "off"], show=False)
     print("🥊 Fight")
 
 
-def start_death_monitor():
-    """Start background process to monitor containers and turn panes red on death"""
-    agents_list = [(a.get("instance", a["name"]), a["container"]) for a in AGENTS]
-    monitor_script = f'''
-import subprocess
-import time
-
-SESSION = "{SESSION_NAME}"
-AGENTS = {agents_list}
-
-dead = set()
-
-while True:
-    try:
-        # Check if tmux session exists
-        result = subprocess.run(["tmux", "has-session", "-t", SESSION], capture_output=True)
-        if result.returncode != 0:
-            break  # Session gone, exit monitor
-
-        for i, (name, container) in enumerate(AGENTS):
-            if container in dead:
-                continue
-
-            # Check if container is running
-            result = subprocess.run(
-                ["docker", "inspect", "-f", "{{{{.State.Running}}}}", container],
-                capture_output=True, text=True
-            )
-
-            if result.stdout.strip() != "true":
-                # Container dead - clear pane and turn red
-                pane = f"{{SESSION}}:0.{{i}}"
-                subprocess.run(["tmux", "send-keys", "-t", pane, "clear", "Enter"])
-                subprocess.run(["tmux", "select-pane", "-t", pane, "-P", "bg=red,fg=white"])
-                dead.add(container)
-                print(f"💀 {{name}} ELIMINATED")
-
-        time.sleep(2)
-    except Exception as e:
-        time.sleep(5)
-'''
-
-    # Write monitor script
-    monitor_path = Path(__file__).parent / "ctf-workspaces" / ".death-monitor.py"
-    monitor_path.parent.mkdir(exist_ok=True)
-    monitor_path.write_text(monitor_script)
-
-    # Start monitor in background
-    log_path = Path(__file__).parent / "ctf-workspaces" / ".death-monitor.log"
-    with open(log_path, "w") as log:
-        subprocess.Popen(
-            ["python3", str(monitor_path)],
-            stdout=log,
-            stderr=log,
-            start_new_session=True
-        )
-    print("👁️ Death monitor started")
-
-
 def show_status():
     """Show container status"""
     print("\n📊 Container Status:")
-    for i, agent in enumerate(AGENTS):
-        instance = agent.get('instance', agent['name'])
-        ip = f"172.20.0.{10 + i}"
-        output, _ = run(f"docker inspect -f '{{{{.State.Running}}}}' {agent['container']}", capture=True, show=False)
-        status = "🟢 ALIVE" if output == "true" else "💀 DEAD"
-        print(f"  {instance:12} ({ip}): {status}")
+    states = inspect_running([a['container'] for a in AGENTS])
+    for agent in AGENTS:
+        running = states.get(agent['container'], {}).get("running")
+        status = "🟢 ALIVE" if running else "💀 DEAD"
+        print(f"  {agent['instance']:12} ({agent['ip']}): {status}")
 
 
 def main():
@@ -446,13 +620,13 @@ def main():
 
     if len(sys.argv) < 2:
         print("\nUsage:")
-        print("  python ctf-arena.py run [agents...]     - Full setup + start + attach")
-        print("  python ctf-arena.py setup [agents...]   - Setup without auto-starting")
-        print("  python ctf-arena.py start               - Launch AI agents in panes")
+        print("  python ctf-arena.py run [agents...]     - Full setup + start + attach (--reuse keeps containers)")
+        print("  python ctf-arena.py setup [agents...]   - Full setup without attaching (--reuse keeps containers)")
+        print("  python ctf-arena.py start               - Respawn stopped agent panes")
         print("  python ctf-arena.py go                  - Send 'Fight' to all agents")
         print("  python ctf-arena.py status              - Show container status")
         print("  python ctf-arena.py attach              - Attach to tmux session")
-        print("  python ctf-arena.py cleanup [--wipe]    - Stop containers")
+        print("  python ctf-arena.py cleanup [--hard] [--wipe] - Stop containers (--hard removes them)")
         print("")
         print(f"Available agents: {', '.join(get_agent_names())}")
         print("Example: python ctf-arena.py run claude codex amp")
@@ -466,19 +640,28 @@ def main():
         AGENTS = filter_agents(agent_names)
         print(f"🎯 Selected agents: {', '.join(a['name'] for a in AGENTS)}")
 
-    env = load_env()
+    # These commands never consume .env - skip the parse entirely
+    env = load_env() if cmd not in ("status", "attach", "go", "cleanup") else None
+    AGENTS = prepare_specs(env or {})
+    reuse = "--reuse" in sys.argv
 
     if cmd == "setup":
-        cleanup()
+        if reuse:
+            run(f"tmux kill-session -t {SESSION_NAME} 2>/dev/null || true", check=False)
+        else:
+            cleanup()
         build_image()
         setup_network()
-        start_containers(env)
-        workspaces = create_agent_workdirs()
-        setup_tmux(workspaces, env)
-        start_death_monitor()
-        print(f"\n✅ Arena ready!")
-        print(f"   Run 'python ctf-arena.py start' to launch agents")
-        print(f"   Or 'tmux attach -t {SESSION_NAME}' to view")
+        # Workdirs must exist before the containers bind-mount them
+        create_agent_workdirs()
+        if reuse:
+            ensure_containers()
+        else:
+            start_containers()
+        setup_tmux()
+        print(f"\n✅ Arena ready! Agents are starting in their panes")
+        print(f"   'tmux attach -t {SESSION_NAME}' to view")
+        print(f"   'python ctf-arena.py go' to send Fight")
 
     elif cmd == "build":
         build_image()
@@ -497,30 +680,36 @@ def main():
 
     elif cmd == "cleanup":
         wipe = "--wipe" in sys.argv
-        cleanup(remove_volumes=wipe)
+        hard = wipe or "--hard" in sys.argv
+        cleanup(remove_volumes=wipe, stop_only=not hard)
         run(f"docker network rm {NETWORK_NAME} 2>/dev/null || true", check=False)
         # Clean workspaces
-        workspaces = Path(__file__).parent / "ctf-workspaces"
-        if workspaces.exists():
+        if WORKSPACES_DIR.exists():
             import shutil
-            shutil.rmtree(workspaces)
+            shutil.rmtree(WORKSPACES_DIR)
         print("✅ Cleaned up" + (" (volumes preserved - logins saved)" if not wipe else ""))
 
     elif cmd == "run":
-        cleanup()
+        if reuse:
+            run(f"tmux kill-session -t {SESSION_NAME} 2>/dev/null || true", check=False)
+        else:
+            cleanup()
         build_image()
         setup_network()
-        start_containers(env)
-        workspaces = create_agent_workdirs()
-        setup_tmux(workspaces, env)
-        start_death_monitor()
-        print(f"\n✅ Arena ready!")
-        print("=" * 60)
-        print("  Starting AI agents in 3 seconds...")
-        print("=" * 60)
-        time.sleep(3)
-        start_agents()
-        time.sleep(1)
+        # Workdirs must exist before the containers bind-mount them
+        create_agent_workdirs()
+        if reuse:
+            ensure_containers()
+        else:
+            start_containers()
+        if len(AGENTS) == 1:
+            # Single agent (debugging): no tmux, no panes, no death monitor -
+            # instructions arrive via the bind mount, just exec straight in
+            agent = AGENTS[0]
+            print(f"\n✅ Arena ready! Exec'ing into {agent['container']}...")
+            os.execvp("docker", ["docker", "exec", "-it", agent['container'], "bash", "-lc", agent['run']])
+        setup_tmux()
+        print(f"\n✅ Arena ready! Agents are starting in their panes...")
         os.execvp("tmux", ["tmux", "attach", "-t", SESSION_NAME])
 
     else: